@@ -1,100 +1,70 @@
 #!/usr/bin/env python
 
 import os
-import json
 import logging
-import getpass
-import re
 
 import simpleFarm
-from meshroom.core.desc import Level
 from meshroom.core.submitter import BaseSubmitter
 
+from mrSubmitters.configUtils import getBaseService, getConfig, getServiceFromConfig
+from mrSubmitters.farmUtils import PROPAGATED_ENV_VARS, getFarmUser, getMeshroomCompute
+from mrSubmitters.rezUtils import getRequestPackages
+
 currentDir = os.path.dirname(os.path.realpath(__file__))
-binDir = os.path.dirname(os.path.dirname(os.path.dirname(currentDir)))
+_MESHROOM_COMPUTE = getMeshroomCompute(currentDir)
+
 
 class SimpleFarmSubmitter(BaseSubmitter):
 
     filepath = os.environ.get('SIMPLEFARMCONFIG', os.path.join(currentDir, 'tractorConfig.json'))
-    config = json.load(open(filepath))
 
-    reqPackages = []
-    environment = {}
+    reqPackages = None
     ENGINE = ''
     DEFAULT_TAGS = {'prod': ''}
-    REZ_DELIMITER_PATTERN = re.compile(r"-|==|>=|>|<=|<")
 
     def __init__(self, parent=None):
         super().__init__(name='SimpleFarm', parent=parent)
-        self.engine = os.environ.get('MESHROOM_SIMPLEFARM_ENGINE', 'tractor')
-        self.share = os.environ.get('MESHROOM_SIMPLEFARM_SHARE', 'vfx')
-        self.prod = os.environ.get('PROD', 'mvg')
-        if 'REZ_USED_REQUEST' in os.environ:
-            requestPackages = os.environ.get('REZ_USED_REQUEST', '').split()
-            resolvedPackages = os.environ.get('REZ_RESOLVE', '').split()
-            resolvedVersions = {}
-            for r in resolvedPackages:
-                # remove implicit packages
-                if r.startswith('~'):
-                    continue
-                # logging.info('REZ: {}'.format(str(r)))
-                name, version = self.REZ_DELIMITER_PATTERN.split(r, maxsplit=1)
-                # logging.info('    v: {}'.format(str(v)))
-                resolvedVersions[name] = version
-            requestPackageNames = set()  # Use set to remove duplicates
-            for p in requestPackages:
-                if p.startswith('~'):
-                    continue
-                v = self.REZ_DELIMITER_PATTERN.split(p, maxsplit=1)
-                requestPackageNames.add(v[0])
-            for p in requestPackageNames:
-                # Use "==" to guarantee that the job uses the exact same version
-                # as the environment where Meshroom was launched.
-                self.reqPackages.append(f"{p}=={resolvedVersions[p]}")
+        env = os.environ
+        self.engine = env.get('MESHROOM_SIMPLEFARM_ENGINE', 'tractor')
+        self.share = env.get('MESHROOM_SIMPLEFARM_SHARE', 'vfx')
+        self.prod = env.get('PROD', 'mvg')
+        if 'REZ_USED_REQUEST' in env:
+            self.reqPackages = list(getRequestPackages(env['REZ_USED_REQUEST'], env.get('REZ_RESOLVE', '')))
             logging.debug(f'REZ Packages: {str(self.reqPackages)}')
-        elif 'REZ_MESHROOM_VERSION' in os.environ:
-            self.reqPackages = [f"meshroom-{os.environ.get('REZ_MESHROOM_VERSION', '')}"]
+        elif 'REZ_MESHROOM_VERSION' in env:
+            self.reqPackages = [f"meshroom-{env['REZ_MESHROOM_VERSION']}"]
         else:
             self.reqPackages = None
 
-        if 'REZ_DEV_PACKAGES_ROOT' in os.environ:
-            self.environment['REZ_DEV_PACKAGES_ROOT'] = os.environ['REZ_DEV_PACKAGES_ROOT']
-
-        if 'REZ_PROD_PACKAGES_PATH' in os.environ:
-            self.environment['REZ_PROD_PACKAGES_PATH'] = os.environ['REZ_PROD_PACKAGES_PATH']
+        self.environment = {k: v for k in PROPAGATED_ENV_VARS if (v := env.get(k)) is not None}
 
-        if 'PROD' in os.environ:
-            self.environment['PROD'] = os.environ['PROD']
+    @classmethod
+    def getConfig(cls):
+        """ Get the farm config, only loaded on first use """
+        return getConfig(cls.filepath)
 
-        if 'PROD_ROOT' in os.environ:
-            self.environment['PROD_ROOT'] = os.environ['PROD_ROOT']
-        
-        if 'PROD_MOUNT' in os.environ:
-            self.environment['PROD_MOUNT'] = os.environ['PROD_MOUNT']
-
-    def createTask(self, meshroomFile, node):
-        tags = self.DEFAULT_TAGS.copy()  # copy to not modify default tags
+    def createTask(self, meshroomFile, node, config=None):
+        """ Create the farm task of a node, config is the farm config if already loaded """
+        if config is None:
+            config = self.getConfig()
         nbFrames = node.size
         arguments = {}
         parallelArgs = ''
-        print('node: ', node.name)
+        logging.debug(f'node: {node.name}')
         if node.isParallelized:
             blockSize, fullSize, nbBlocks = node.nodeDesc.parallelization.getSizes(node)
             parallelArgs = ' --iteration @start'
             arguments.update({'start': 0, 'end': nbBlocks - 1, 'step': 1})
 
-        tags['nbFrames'] = nbFrames
-        tags['prod'] = self.prod
-        allRequirements = set()
-        allRequirements.update(self.config['CPU'].get(node.nodeDesc.cpu.name, []))
-        allRequirements.update(self.config['RAM'].get(node.nodeDesc.ram.name, []))
-        allRequirements.update(self.config['GPU'].get(node.nodeDesc.gpu.name, []))
+        tags = {**self.DEFAULT_TAGS, 'nbFrames': nbFrames, 'prod': self.prod}
+        nodeDesc = node.nodeDesc
+        service = getServiceFromConfig(config, nodeDesc.cpu.name, nodeDesc.ram.name, nodeDesc.gpu.name)
 
-        executable = 'meshroom_compute' if self.reqPackages else os.path.join(binDir, 'meshroom_compute')
+        executable = 'meshroom_compute' if self.reqPackages else _MESHROOM_COMPUTE
         taskCommand = f"{executable} --node {node.name} \"{meshroomFile}\" {parallelArgs} --extern"
         task = simpleFarm.Task(
             name=node.name, command=taskCommand, tags=tags, rezPackages=self.reqPackages,
-            requirements={'service': str(','.join(allRequirements))}, **arguments)
+            requirements={'service': service}, **arguments)
         return task
 
     def submit(self, nodes, edges, filepath, submitLabel="{projectName}"):
@@ -103,32 +73,30 @@ class SimpleFarmSubmitter(BaseSubmitter):
         name = submitLabel.format(projectName=projectName)
 
         comment = filepath
-        nbFrames = max([node.size for node in nodes])
+        nbFrames = max((node.size for node in nodes), default=0)
 
         mainTags = {
             'prod': self.prod,
             'nbFrames': str(nbFrames),
             'comment': comment,
         }
-        allRequirements = list(self.config.get('BASE', []))
+        config = self.getConfig()  # Loaded once for the whole submission
 
         # Create Job Graph
         job = simpleFarm.Job(name,
                 tags=mainTags,
-                requirements={'service': str(','.join(allRequirements))},
+                requirements={'service': getBaseService(config)},
                 environment=self.environment,
-                user=os.environ.get('FARM_USER', os.environ.get('USER', getpass.getuser())),
+                user=getFarmUser(),
                 )
 
-        nodeNameToTask = {}
-
-        for node in nodes:
-            task = self.createTask(filepath, node)
+        nodeNameToTask = {node.name: self.createTask(filepath, node, config) for node in nodes}
+        for task in nodeNameToTask.values():
             job.addTask(task)
-            nodeNameToTask[node.name] = task
 
+        getTask = nodeNameToTask.__getitem__
         for u, v in edges:
-            nodeNameToTask[u.name].dependsOn(nodeNameToTask[v.name])
+            getTask(u.name).dependsOn(getTask(v.name))
 
         if self.engine == 'tractor-dummy':
             job.submit(share=self.share, engine='tractor', execute=True)
@@ -1,80 +1,85 @@
 #!/usr/bin/env python
 
-import re
 import os
 import shutil
 import json
-import getpass
 import logging
 import shlex
-from collections import namedtuple
+import functools
+from collections import ChainMap, deque
+from dataclasses import dataclass
 
 from meshroom.core.submitter import BaseSubmitter
 
-from tractor.api import author
+from mrSubmitters.configUtils import getBaseService, getConfig, getServiceFromConfig
+from mrSubmitters.farmUtils import PROPAGATED_ENV_VARS, getDefaultUser, getFarmUser, getMeshroomCompute
+from mrSubmitters.rezUtils import getRequestPackages
 
 currentDir = os.path.dirname(os.path.realpath(__file__))
-binDir = os.path.dirname(os.path.dirname(os.path.dirname(currentDir)))
+_MESHROOM_COMPUTE = getMeshroomCompute(currentDir)
 
-REZ_DELIMITER_PATTERN = re.compile(r"(-|==|>=|>|<=|<)")
+# Farm defaults are read once, the env does not change during the submission
+_DEFAULT_SERVICE = os.environ.get('DEFAULT_TRACTOR_SERVICE')
+_DEFAULT_LIMIT = os.environ.get('DEFAULT_TRACTOR_LIMIT')
+_DEFAULT_SHARE = os.environ['DEFAULT_FARM_SHARE_TRACTOR'].split(',') if 'DEFAULT_FARM_SHARE_TRACTOR' in os.environ else None
 TRACTOR_JOB_URL = "http://tractor-engine/tv/#jid={jid}"
 LICENSES_MAP = {
     'mtoa': 'arnold',
     'houdiniE': 'houdinie', 
 }
 
-Chunk = namedtuple("chunk", ["iteration", "start", "end"])
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    """ Range of frames computed by one tractor task """
+    iteration: int
+    start: int
+    end: int
 
 
 def get_job_packages():
     """ Get list of packages required for the job
     Depends on env var and current rez context
     """
+    env = os.environ
     reqPackages = []
-    if 'REZ_REQUEST' in os.environ:
-        packages = os.environ.get('REZ_USED_REQUEST', '').split()
-        resolvedPackages = os.environ.get('REZ_RESOLVE', '').split()
-        resolvedVersions = {}
-        for r in resolvedPackages:
-            if r.startswith('~'):  # remove implicit packages
-                continue
-            v = r.split('-')
-            if len(v) == 2:
-                resolvedVersions[v[0]] = v[1]
-            elif len(v) > 2:  # Handle case with multiple hyphen-minus
-                resolvedVersions[v[0]] = "-".join(v[1:])
-        usedPackages = set()  # Use set to remove duplicates
-        for p in packages:
-            if p.startswith('~') or p.startswith("!"):
-                continue
-            v = REZ_DELIMITER_PATTERN.split(p)
-            usedPackages.add(v[0])
-        for p in usedPackages:
-            # Use "==" to make sure we have the same version in the job that the one we have in the env
-            # where meshroom is launched
-            reqPackages.append("==".join([p, resolvedVersions[p]]))
+    if 'REZ_REQUEST' in env:
+        reqPackages = list(getRequestPackages(env.get('REZ_USED_REQUEST', ''), env.get('REZ_RESOLVE', '')))
         logging.debug(f"TractorSubmitter: REZ Packages: {str(reqPackages)}")
-    elif 'REZ_MESHROOM_VERSION' in os.environ:
-        reqPackages.append(f"meshroom-{os.environ.get('REZ_MESHROOM_VERSION', '')}")
+    elif 'REZ_MESHROOM_VERSION' in env:
+        reqPackages.append(f"meshroom-{env.get('REZ_MESHROOM_VERSION', '')}")
     return reqPackages
 
 
+@functools.lru_cache(maxsize=None)
+def getTractorAuthor():
+    """ Import the tractor author API on first use
+    Meshroom loads all submitters on startup, the tractor client is only needed to build a job
+    """
+    from tractor.api import author
+    return author
+
+
+# Tractor service expressions of the requirements that are not passed as is
+_REQ_TEMPLATES = {
+    'minNbCore': '@.nCPUs >= %d',
+    'maxNbCore': '@.nCPUs <= %d',
+    'ramUse': '(1024 * @.mem) > %d',
+}
+
+
 def filterRequirements(requirements):
     """ Filter and process requirements for Tractor
     >>> filterRequirements({'minNbCore': 1, 'maxNbCore': 5, 'ramUse': 1024*64, 'service': 'RenderHigh64'}
-        {'service': 'RenderHigh64 && @.nCPUs >= 1 && @.nCPUs <= 5 && (1024 * @.mem) > 65536)'}
+        {'service': 'RenderHigh64 && @.nCPUs >= 1 && @.nCPUs <= 5 && (1024 * @.mem) > 65536'}
     """
     _requirements = {}
     serviceAdd = []
-    for req in requirements:
-        if req == 'minNbCore':
-            serviceAdd.append( '@.nCPUs >= %d' % requirements[req] )
-        elif req == 'maxNbCore':
-            serviceAdd.append( '@.nCPUs <= %d' % requirements[req] )
-        elif req == 'ramUse':
-            serviceAdd.append( '(1024 * @.mem) > %d)' % requirements[req] )
+    for req, value in requirements.items():
+        template = _REQ_TEMPLATES.get(req)
+        if template is not None:
+            serviceAdd.append(template % value)
         else:
-            _requirements[req] = requirements[req]
+            _requirements[req] = value
     if serviceAdd:
         _serviceAdd = ' && '.join(serviceAdd)
         if 'service' in _requirements:
@@ -84,31 +89,44 @@ def filterRequirements(requirements):
     return _requirements
 
 
-def rezWrapCommand(cmd, useCurrentContext: bool = True, otherRezPkg: list[str] = None):
-    """ Wrap command to be runned using rez
-    :param cmd: command to run
-    :type cmd: bool
+def rezWrapArgv(argv, useCurrentContext: bool = True, otherRezPkg: list[str] = None) -> list[str]:
+    """ Wrap command argv to be runned using rez
+    The rez prefix has a known shape so it is built directly instead of being lexed with shlex
+    :param argv: command to run
+    :type argv: list[str]
     :param useCurrentContext: use current rez context to retrieve a list of rez packages
     :type useCurrentContext: bool
     :param otherRezPkg: Additionnal rez packages
     :type otherRezPkg: list[str]
     """
-    packages = set()
-    if useCurrentContext:
-        packages.add(os.environ.get('REZ_RESOLVE', ''))
-    if otherRezPkg:
-        packages.update(otherRezPkg)
-    packagesStr = " ".join([p for p in packages if p])
+    rezResolve = os.environ.get('REZ_RESOLVE', '') if useCurrentContext else ''
+    return [*_getRezPrefixArgv(rezResolve, tuple(otherRezPkg or ())), *argv]
+
+
+@functools.lru_cache(maxsize=128)
+def _getRezPrefixArgv(rezResolve, otherRezPkg):
+    """ Get the "rez env <packages> --" argv prefix, shared by all the tasks of a job """
+    packagesStr = _getRezPackagesStr(rezResolve, otherRezPkg)
     if packagesStr:
-        rezBin = "rez"
-        if "REZ_BIN" in os.environ and os.environ["REZ_BIN"]:
-            rezBin = os.environ["REZ_BIN"]
-        elif "REZ_PACKAGES_ROOT" in os.environ and os.environ["REZ_PACKAGES_ROOT"]:
-            rezBin = os.path.join(os.environ["REZ_PACKAGES_ROOT"], "bin/rez")
-        elif shutil.which("rez"):
-            rezBin = shutil.which("rez")
-        return f"{rezBin} env {packagesStr} -- {cmd}"
-    return cmd
+        return (getRezBin(), "env", *packagesStr.split(), "--")
+    return ()
+
+
+@functools.lru_cache(maxsize=128)
+def _getRezPackagesStr(rezResolve, otherRezPkg):
+    """ Join the rez packages of the command, the same packages are used by all tasks of a job """
+    packages = dict.fromkeys((rezResolve,) + otherRezPkg)  # Remove duplicates, keep order
+    return " ".join([p for p in packages if p])
+
+
+@functools.lru_cache(maxsize=None)
+def getRezBin():
+    """ Get the rez executable, resolved only once """
+    if "REZ_BIN" in os.environ and os.environ["REZ_BIN"]:
+        return os.environ["REZ_BIN"]
+    elif "REZ_PACKAGES_ROOT" in os.environ and os.environ["REZ_PACKAGES_ROOT"]:
+        return os.path.join(os.environ["REZ_PACKAGES_ROOT"], "bin/rez")
+    return shutil.which("rez") or "rez"
 
 
 def toTractorEnv(environment):
@@ -116,10 +134,17 @@ def toTractorEnv(environment):
     return [f"setenv {k}={v}" for k, v in environment.items()]
 
 
+def formatMetadata(tags):
+    """ Format tags as tractor metadata, in compact json """
+    return json.dumps(tags, separators=(',', ':'), default=str)
+
+
 class TractorTask:
     """ Stores a task and the additional tasks spawned for each chunks
     Will be helpful later to resubmit only failed chunks for example
     """
+
+    __slots__ = ("task", "chunkTasks")
     
     def __init__(self, task):
         self.task = task
@@ -128,9 +153,20 @@ class TractorTask:
     def addChunkTask(self, chunk, task):
         self.chunkTasks[chunk] = task
 
+    def getDependencyTargets(self):
+        """ Get the tractor tasks the children depend on: the chunk tasks if any, the task otherwise """
+        if self.chunkTasks:
+            return tuple(self.chunkTasks.values())
+        return (self.task,)
+
 
 class TractorTaskCreator:
     """ Builder class for tractor tasks """
+
+    __slots__ = (
+        "task", "chunks", "env", "envKey", "rezArgs", "baseArgv", "tractorCmd",
+        "limits", "service", "taskTags", "metadata",
+    )
     
     def __init__(self, task, job):
         """ Build task metadata """
@@ -138,9 +174,14 @@ class TractorTaskCreator:
         self.chunks = self.task.getChunks()
         
         # self.env
-        self.env = job.environment.copy()
-        if self.task.environment:
-            self.env.update(self.environment)
+        # All the commands of the task share the same env, it is formatted once.
+        # Without task specific variables the env formatted by the job is reused.
+        if self.task.environment or job.envKey is None:
+            self.env = ChainMap(self.task.environment, job.environment)  # Task variables override the job ones
+            self.envKey = toTractorEnv(self.env)
+        else:
+            self.env = job.environment
+            self.envKey = job.envKey
         
         # self.rezArgs
         self.rezArgs = {
@@ -151,61 +192,55 @@ class TractorTaskCreator:
             self.rezArgs['useCurrentContext'] = False
             self.rezArgs['otherRezPkg'] = self.task.rezPackages
 
+        # self.baseArgv
+        # Chunk commands only differ by their iteration, so the command is wrapped and split once
+        self.baseArgv = shlex.split(self.task.command)
+        if self.task.execViaRez:
+            self.baseArgv = rezWrapArgv(self.baseArgv, **self.rezArgs)
+
         # self.tractorCmd
         if self.chunks:
             # Empty task with multiple commands (sub-tasks) to execute in parallel
             self.tractorCmd = None
         else:
             # Simple task with only one command to execute
-            cmd = self.task.command
-            if self.task.execViaRez:
-                cmd = rezWrapCommand(cmd, **self.rezArgs)
-            self.tractorCmd = shlex.split(cmd)
+            self.tractorCmd = self.baseArgv
 
         # requirements
         # Licenses --> tractor handle licenses as limits
-        requirements = filterRequirements(job.requirements)
-        self.limits = [LICENSES_MAP.get(license, license) for license in self.task.licenses]
+        # The job requirements are the same for all tasks, they are filtered once per cook by the job
+        requirements = job.filteredRequirements
+        if requirements is None:
+            requirements = filterRequirements(job.requirements)
+        self.limits = list(map(LICENSES_MAP.get, self.task.licenses, self.task.licenses))
         if 'limits' in requirements:
             self.limits.extend(requirements['limits'])
-        if 'DEFAULT_TRACTOR_LIMIT' in os.environ:
-            self.limits.append(os.environ['DEFAULT_TRACTOR_LIMIT'])
+        if _DEFAULT_LIMIT is not None:
+            self.limits.append(_DEFAULT_LIMIT)
         
         # Service
-        taskRequirements = requirements.copy()
-        # Requirements
+        taskRequirements = requirements
+        # Requirements, only the task ones remain to be processed
         if self.task.requirements:
-            taskRequirements.update(self.task.requirements)
-        taskRequirements = filterRequirements(taskRequirements)
-        self.service = taskRequirements.get('service', os.environ['DEFAULT_TRACTOR_SERVICE'])
+            taskRequirements = filterRequirements({**requirements, **self.task.requirements})
+        self.service = taskRequirements.get('service', _DEFAULT_SERVICE)
         
         self.taskTags = self.task.tags.copy()
-    
-    def getLimits(self, requirements):
-        taskLimits = [LICENSES_MAP.get(license, license) for license in self.task.licenses]
-        if 'limits' in requirements:
-            taskLimits.extend(requirements['limits'])
-        if 'DEFAULT_TRACTOR_LIMIT' in os.environ:
-            taskLimits.append(os.environ['DEFAULT_TRACTOR_LIMIT'])
-        return taskLimits
+        self.metadata = formatMetadata(self.taskTags)
     
     def cookChunkTask(self, tractorTask, chk):
         """ Cook individual chunk task """
-        # Substitute
-        cmd = self.task.command + f' --iteration {chk.iteration}'
-        if self.task.execViaRez:
-            cmd = rezWrapCommand(cmd, **self.rezArgs)
         # Create command task
         tractorTaskCmd = tractorTask.newTask(
             title=self.task.name + f"_{chk.start}_{chk.end}",
-            argv=shlex.split(cmd),
+            argv=self.baseArgv + ['--iteration', str(chk.iteration)],
             service=self.service,
-            metadata=str(self.taskTags),
+            metadata=self.metadata,
         )
         # licenses are handled via 'tags'
         tractorTaskCmd.cmds[0].tags = self.limits
         # set environment on command
-        tractorTaskCmd.cmds[0].envkey = toTractorEnv(self.env)
+        tractorTaskCmd.cmds[0].envkey = self.envKey
         
         return tractorTaskCmd
     
@@ -213,17 +248,17 @@ class TractorTaskCreator:
         """ Creates the task
         Returns a TractorTask object
         """
-        tractorTask = author.Task(
+        tractorTask = getTractorAuthor().Task(
             title=self.task.name,
             argv=self.tractorCmd,
             service=self.service,
-            metadata=str(self.taskTags),
+            metadata=self.metadata,
         )
         res = TractorTask(tractorTask)
         if not self.chunks:
             for cmd in tractorTask.cmds:
                 cmd.tags = self.limits
-                cmd.envkey = toTractorEnv(self.env)
+                cmd.envkey = self.envKey
         else:
             # sub commands
             for chk in self.chunks:
@@ -237,6 +272,11 @@ class Task:
     However one Task object can spool multiple tractor task because we will create individual 
     tasks for chunks.
     """
+
+    __slots__ = (
+        "uid", "name", "command", "tags", "rezPackages", "execViaRez", "requirements",
+        "optionalArgs", "_children", "_parents", "environment", "chunkParams", "licenses", "_hash",
+    )
     
     def __init__(self, name, uid, command, tags=None, execViaRez=True, rezPackages=None, requirements=None, environment=None, **kwargs):
         self.uid = uid
@@ -247,22 +287,28 @@ class Task:
         self.execViaRez = execViaRez
         self.requirements = requirements or {}
         self.optionalArgs = kwargs
-        self._children = set()
-        self._parents = set()
+        # Dicts used as ordered sets, so the cooked graph is the same on each submission
+        self._children = {}
+        self._parents = {}
         self.environment = environment or {}
         
         # Keyword args
         self.chunkParams = kwargs.get("chunks")
         self.licenses = kwargs.get("licenses", [])
+
+        # Tasks are hashed on every graph lookup, name and uid don't change once created
+        self._hash = hash(("TractorTask", self.name, self.uid))
     
     def __repr__(self):
         return f"<Task {self.name} {self.uid}>"
     
     def __hash__(self):
-        return hash(frozenset(["TractorTask", self.name, self.uid]))
+        return self._hash
     
     def __eq__(self, __value: object) -> bool:
-        return hash(self) == hash(__value)
+        if self is __value:
+            return True
+        return isinstance(__value, Task) and self.name == __value.name and self.uid == __value.uid
 
     def connect(self, task):
         """ Add a task in the children of the current task
@@ -271,8 +317,8 @@ class Task:
             for t in task:
                 self.connect(t)
         else:
-            self._children.add(task)  # Add task as current object children
-            task._parents.add(self)   # Add current object as task parent
+            self._children[task] = None  # Add task as current object children
+            task._parents[self] = None   # Add current object as task parent
     
     def getChunks(self) -> list[Chunk]:
         """ Get list of chunks """
@@ -280,10 +326,11 @@ class Task:
         if self.chunkParams:
             start, end = self.chunkParams.get("start", -1), self.chunkParams.get("end", -2)
             size = self.chunkParams.get("packetSize", 1)
-            frameRange = list(range(start, end+1, 1))
-            if frameRange:
-                slices = [frameRange[i:i + size] for i in range(0, len(frameRange), size)]
-                it = [Chunk(i, item[0], item[-1]) for i, item in enumerate(slices)]
+            nbFrames = end - start + 1
+            if nbFrames > 0:
+                # Compute chunk boundaries directly instead of slicing the frame range
+                nbChunks = (nbFrames + size - 1) // size
+                it = [Chunk(i, start + i * size, min(start + (i + 1) * size - 1, end)) for i in range(nbChunks)]
         return it
 
 
@@ -293,10 +340,12 @@ class TaskGraph:
     don't create multiple times the same task.
     Also we store the created tasks and chunks info so that might be useful in the future
     """
+
+    __slots__ = ("job", "_tasks", "__cooked")
     
     def __init__(self, job):
         self.job = job
-        self._tasks = set()
+        self._tasks = {}  # Task -> Task, to retrieve an already added task in O(1)
         self.__cooked = {}
     
     def __len__(self):
@@ -310,31 +359,52 @@ class TaskGraph:
     def leaves(self):
         return [task for task in self._tasks if not task._children]
     
+    def addTask(self, task):
+        """ Add task to the graph, an equal task already added is returned instead """
+        existing = self._tasks.get(task)
+        if existing is not None:
+            logging.error(f"TractorSubmitter: Task already created : {existing}")
+            return existing
+        self._tasks[task] = task
+        return task
+
     def cookTask(self, task):
-        """ Cook task, chunk tasks, and set tasks dependencies """
+        """ Cook task and its chunk tasks """
         if task.uid not in self.__cooked:
             logging.info(f"TractorSubmitter: Create Tractor Task: {task.name}")
-            tractorTask = TractorTaskCreator(task, self.job).cook()
-            self.__cooked[task.uid] = tractorTask
-            for child in task._children:
-                childTask = self.cookTask(child)
-                if tractorTask.chunkTasks:
-                    for chkTask in tractorTask.chunkTasks.values():
-                        chkTask.addChild(childTask)
-                else:
-                    tractorTask.task.addChild(childTask)
+            self.__cooked[task.uid] = TractorTaskCreator(task, self.job).cook()
         return self.__cooked[task.uid].task
     
     def cook(self, jobTask):
         """ Cook the graph (i.e. create all tractor tasks) and dependencies
         jobTask is the root task for the whole job
+        Tasks are cooked in topological order (Kahn's algorithm): each task is cooked once,
+        after all its parents, and deep graphs don't hit the recursion limit.
         """
-        for task in self.roots:
-            child = self.cookTask(task)
-            jobTask.addChild(child)
+        inDegree = {task: len(task._parents) for task in self._tasks}
+        ready = deque(task for task, degree in inDegree.items() if degree == 0)
+        depTargets = {}  # Task -> tractor tasks its children are added to, computed once per task
+        while ready:
+            task = ready.popleft()
+            tractorTask = self.cookTask(task)
+            depTargets[task] = self.__cooked[task.uid].getDependencyTargets()
+            if not task._parents:
+                jobTask.addChild(tractorTask)
+            for parent in task._parents:
+                for target in depTargets[parent]:
+                    target.addChild(tractorTask)
+            for child in task._children:
+                degree = inDegree.get(child, len(child._parents)) - 1
+                inDegree[child] = degree
+                if degree == 0:
+                    ready.append(child)
+        if len(self.__cooked) < len(inDegree):
+            logging.error("TractorSubmitter: Cycle in the task graph, some tasks have not been created")
 
 
 class Job:
+    __slots__ = ("name", "tags", "requirements", "environment", "user", "comment", "paused", "_graph", "share", "envKey", "filteredRequirements")
+
     _priorityDict = {
         "low": 4000,
         "normal": 5000,
@@ -346,65 +416,72 @@ class Job:
         self.tags = tags or {}
         self.requirements = requirements or {}
         self.environment = environment or {}
-        self.user = user or getpass.getuser()
+        self.user = user or getDefaultUser()
         self.comment = comment
         self.paused = paused
         self._graph = TaskGraph(self)
         self.share = ""
+        self.envKey = None
+        self.filteredRequirements = None
     
     def getShare(self):
         share = self.share
         if share:
             if isinstance(share, (str, bytes)):
                 share = [share]
-        elif 'DEFAULT_FARM_SHARE_TRACTOR' in os.environ:
-            share = os.environ['DEFAULT_FARM_SHARE_TRACTOR'].split(',')
+        elif _DEFAULT_SHARE is not None:
+            share = list(_DEFAULT_SHARE)
         return share
     
-    def getService(self):
-        requirements = filterRequirements(self.requirements)
+    def getService(self, requirements=None):
+        """ Get the job service, requirements are the already filtered job requirements if provided """
+        if requirements is None:
+            requirements = filterRequirements(self.requirements)
         logging.info(f"TractorSubmitter: requirements: {requirements}")
-        if 'service' not in requirements and 'DEFAULT_TRACTOR_SERVICE' not in os.environ:
+        if 'service' not in requirements and _DEFAULT_SERVICE is None:
             raise ValueError('Could not find DEFAULT_TRACTOR_SERVICE in env')
-        service = requirements.get('service', os.environ['DEFAULT_TRACTOR_SERVICE'])
+        service = requirements.get('service', _DEFAULT_SERVICE)
         return service
     
     def addTask(self, task):
         """ Add task and make sure it is unique """
-        # Dont add the task if it has already been created
-        for t in self._graph._tasks:
-            if t == task:
-                logging.error(f"TractorSubmitter: Task already created : {t}")
-                return t
-        self._graph._tasks.add(task)
-        return task
+        return self._graph.addTask(task)
+
+    def connectEdges(self, edges):
+        """ Connect the (parent, child) task pairs in a single pass """
+        for parent, child in edges:
+            parent.connect(child)
     
     def cook(self):
         """ Cook job and tasks graph """
         # auto. add FARM_USER user
         self.environment['FARM_USER'] = self.user
         tags = self.tags.copy()
-        env = self.environment.copy()
+        # Formatted once, shared with the tasks that don't override the env
+        self.envKey = toTractorEnv(self.environment)
+        # Filtered once per cook, shared by all the tasks
+        self.filteredRequirements = filterRequirements(self.requirements)
         # Create job
-        tractorJob = author.Job(
+        tractorJob = getTractorAuthor().Job(
             title=self.name,
-            service=self.getService(),
-            metadata=str(tags),
-            envkey=toTractorEnv(env),
+            service=self.getService(self.filteredRequirements),
+            metadata=formatMetadata(tags),
+            envkey=self.envKey,
             paused=self.paused,
             comment=self.comment,
             spoolcwd='/tmp',
             projects=self.getShare()
         )
         
-        serialsubtasks = (len(self._graph.leaves) == 1)
-        jobTask = tractorJob.newTask(title=self.name, argv=None, serialsubtasks=serialsubtasks)
-        self._graph.cook(jobTask)
         if len(self._graph) == 0:
             # tractor API will raise a RequiredValueError if no task are in job so we add a dummy one
             # note that the job will not even appear in Tractor web ui
             _ = tractorJob.newTask(title='dummy')
+            return tractorJob
         
+        serialsubtasks = (len(self._graph.leaves) == 1)
+        jobTask = tractorJob.newTask(title=self.name, argv=None, serialsubtasks=serialsubtasks)
+        self._graph.cook(jobTask)
         return tractorJob
     
     def submit(self, priority="normal", share="", dryRun=False, block=False):
@@ -416,8 +493,10 @@ class Job:
         job.priority = self._priorityDict.get(priority, 5000)
 
         if dryRun:
-            logging.info("TractorSubmitter: Job in TCL format :")
-            logging.info(job.asTcl())
+            # Serializing a large job is costly, skip it when the output would be dropped
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("TractorSubmitter: Job in TCL format :")
+                logging.info(job.asTcl())
             return {}
         else:
             jid = job.spool(block=block, owner=self.user)
@@ -431,43 +510,37 @@ class TractorSubmitter(BaseSubmitter):
     """
     
     dryRun = False
-    environment = {}
     DEFAULT_TAGS = {'prod': ''}
 
     filepath = os.environ.get('TRACTORCONFIG', os.path.join(currentDir, 'tractorConfig.json'))
-    config = json.load(open(filepath))
     
     def __init__(self, parent=None):
         super().__init__(name='Tractor', parent=parent)
-        self.share = os.environ.get('MESHROOM_TRACTOR_SHARE', 'vfx')
-        self.prod = os.environ.get('PROD', 'mvg')
+        env = os.environ
+        self.share = env.get('MESHROOM_TRACTOR_SHARE', 'vfx')
+        self.prod = env.get('PROD', 'mvg')
         self.reqPackages = get_job_packages()
-        if 'REZ_DEV_PACKAGES_ROOT' in os.environ:
-            self.environment['REZ_DEV_PACKAGES_ROOT'] = os.environ['REZ_DEV_PACKAGES_ROOT']
-        if 'REZ_PROD_PACKAGES_PATH' in os.environ:
-            self.environment['REZ_PROD_PACKAGES_PATH'] = os.environ['REZ_PROD_PACKAGES_PATH']
-        if 'PROD' in os.environ:
-            self.environment['PROD'] = os.environ['PROD']
-        if 'PROD_ROOT' in os.environ:
-            self.environment['PROD_ROOT'] = os.environ['PROD_ROOT']
-        if 'PROD_MOUNT' in os.environ:
-            self.environment['PROD_MOUNT'] = os.environ['PROD_MOUNT']
-
-    def createTask(self, meshroomFile, node):
-        tags = self.DEFAULT_TAGS.copy()  # copy to not modify default tags
+        self.environment = {k: v for k in PROPAGATED_ENV_VARS if (v := env.get(k)) is not None}
+
+    @classmethod
+    def getConfig(cls):
+        """ Get the farm config, only loaded on first use """
+        return getConfig(cls.filepath)
+
+    def createTask(self, meshroomFile, node, config=None):
+        """ Create the task of a node, config is the farm config if already loaded """
+        if config is None:
+            config = self.getConfig()
         optionalArgs = {}
         logging.debug(f"TractorSubmitter: node: {node.name} ({node._uid})")
         if node.isParallelized:
             blockSize, fullSize, nbBlocks = node.nodeDesc.parallelization.getSizes(node)
             if nbBlocks > 1:  # Is it better like this ?
                 optionalArgs["chunks"] = {'start': 0, 'end': nbBlocks - 1, 'step': 1}
-        tags['nbFrames'] = node.size
-        tags['prod'] = self.prod
-        allRequirements = set()
-        allRequirements.update(self.config['CPU'].get(node.nodeDesc.cpu.name, []))
-        allRequirements.update(self.config['RAM'].get(node.nodeDesc.ram.name, []))
-        allRequirements.update(self.config['GPU'].get(node.nodeDesc.gpu.name, []))
-        exe = "meshroom_compute" if self.reqPackages else os.path.join(binDir, "meshroom_compute")
+        tags = {**self.DEFAULT_TAGS, 'nbFrames': node.size, 'prod': self.prod}
+        nodeDesc = node.nodeDesc
+        service = getServiceFromConfig(config, nodeDesc.cpu.name, nodeDesc.ram.name, nodeDesc.gpu.name)
+        exe = "meshroom_compute" if self.reqPackages else _MESHROOM_COMPUTE
         taskCommand = f"{exe} --node {node.name} \"{meshroomFile}\" --extern"
         task = Task(
             name=node.name,
@@ -475,7 +548,7 @@ class TractorSubmitter(BaseSubmitter):
             command=taskCommand,
             tags=tags,
             rezPackages=self.reqPackages,
-            requirements={'service': str(','.join(allRequirements))},
+            requirements={'service': service},
             **optionalArgs)
         return task
 
@@ -483,33 +556,30 @@ class TractorSubmitter(BaseSubmitter):
         projectName = os.path.splitext(os.path.basename(filepath))[0]
         name = submitLabel.format(projectName=projectName)
         comment = filepath
-        maxNodeSize = max([node.size for node in nodes])
+        maxNodeSize = max((node.size for node in nodes), default=0)
         mainTags = {
             'prod': self.prod,
             'nbFrames': str(maxNodeSize),
             'comment': comment,
         }
-        allRequirements = list(self.config.get('BASE', []))
+        config = self.getConfig()  # Loaded once for the whole submission
 
         # Create Job Graph
         job = Job(
             name,
             tags=mainTags,
-            requirements={'service': str(','.join(allRequirements))},
+            requirements={'service': getBaseService(config)},
             environment=self.environment,
-            user=os.environ.get('FARM_USER', os.environ.get('USER', getpass.getuser())),
+            user=getFarmUser(),
         )
 
-        nodeUidToTask = {}
+        uniqueNodes = {}
         for node in nodes:
-            if node._uid in nodeUidToTask:
-                continue  # HACK: Should not be necessary
-            task = self.createTask(filepath, node)
-            task = job.addTask(task)  # Should not be necessary but we never know
-            nodeUidToTask[node._uid] = task
-
-        for u, v in edges:
-            nodeUidToTask[u._uid].connect(nodeUidToTask[v._uid])
+            uniqueNodes.setdefault(node._uid, node)  # HACK: Should not be necessary, the first node is kept
+        # job.addTask should not be necessary but we never know
+        nodeUidToTask = {uid: job.addTask(self.createTask(filepath, node, config)) for uid, node in uniqueNodes.items()}
+
+        job.connectEdges([(nodeUidToTask[u._uid], nodeUidToTask[v._uid]) for u, v in edges])
 
         res = job.submit(share=self.share, dryRun=self.dryRun)
         if self.dryRun:
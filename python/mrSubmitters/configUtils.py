@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+import os
+import json
+import functools
+
+
+@functools.lru_cache(maxsize=8)
+def loadConfig(path, mtime):
+    """ Load the json config, the file modification time is only used to invalidate the cache """
+    with open(path) as f:
+        return json.load(f)
+
+
+def getConfig(path):
+    """ Get the json config, only read again when the file has been modified """
+    return loadConfig(path, os.path.getmtime(path))
+
+
+# id(config) -> (config, {(cpu, ram, gpu) or 'BASE': service}), the config is kept alive so its id is not reused.
+# A modified config file is loaded as a new config object, so its services are computed again.
+_serviceCaches = {}
+_SERVICE_CACHE_SIZE = 8
+
+
+def _getServiceCache(config):
+    """ Get the services already computed for a loaded config """
+    cache = _serviceCaches.get(id(config))
+    if cache is None:
+        if len(_serviceCaches) >= _SERVICE_CACHE_SIZE:
+            del _serviceCaches[next(iter(_serviceCaches))]  # Drop the oldest config
+        cache = _serviceCaches[id(config)] = (config, {})
+    return cache[1]
+
+
+def getServiceFromConfig(config, cpu, ram, gpu):
+    """ Get the service expression matching the cpu, ram and gpu levels of a node
+    Computed once per levels for a loaded config
+    """
+    services = _getServiceCache(config)
+    levels = (cpu, ram, gpu)
+    service = services.get(levels)
+    if service is None:
+        requirements = set()
+        requirements.update(config['CPU'].get(cpu, []))
+        requirements.update(config['RAM'].get(ram, []))
+        requirements.update(config['GPU'].get(gpu, []))
+        service = services[levels] = ','.join(sorted(requirements))
+    return service
+
+
+def getBaseService(config):
+    """ Get the service required by every job, joined once for a loaded config """
+    services = _getServiceCache(config)
+    service = services.get('BASE')
+    if service is None:
+        service = services['BASE'] = ','.join(config.get('BASE', []))
+    return service
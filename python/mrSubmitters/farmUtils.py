@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+
+import os
+import getpass
+import functools
+
+# Variables of the submitting environment forwarded to the job
+PROPAGATED_ENV_VARS = ('REZ_DEV_PACKAGES_ROOT', 'REZ_PROD_PACKAGES_PATH', 'PROD', 'PROD_ROOT', 'PROD_MOUNT')
+
+
+def getMeshroomCompute(pluginDir):
+    """ Get the meshroom_compute executable the plugin has been installed with
+    :param pluginDir: directory of the submitter plugin (<root>/meshroom/<submitter>)
+    """
+    binDir = os.path.dirname(os.path.dirname(os.path.dirname(pluginDir)))
+    return os.path.join(binDir, 'meshroom_compute')
+
+
+@functools.lru_cache(maxsize=None)
+def getDefaultUser():
+    """ Get the current user, the lookup may query the password database so it is done once """
+    return getpass.getuser()
+
+
+def getFarmUser():
+    """ Get the user the jobs are submitted as
+    FARM_USER takes precedence over USER, the env is read on each call and
+    the default user is only looked up when neither is defined
+    """
+    env = os.environ
+    if 'FARM_USER' in env:
+        return env['FARM_USER']
+    if 'USER' in env:
+        return env['USER']
+    return getDefaultUser()
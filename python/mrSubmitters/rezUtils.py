@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+import functools
+
+# Longest delimiters first so that ">=" wins over ">" at the same position
+REZ_DELIMITERS = ("==", ">=", "<=", "-", ">", "<")
+
+
+def splitRezPackage(package):
+    """ Split a rez package request on its first version delimiter, like str.partition
+    >>> splitRezPackage('alicevision>=3.0')
+        ('alicevision', '>=', '3.0')
+    """
+    index, delimiter = len(package), ''
+    for d in REZ_DELIMITERS:
+        i = package.find(d)
+        if i != -1 and i < index:
+            index, delimiter = i, d
+    return package[:index], delimiter, package[index + len(delimiter):]
+
+
+def getPackageName(package):
+    """ Get the package name of a rez package request
+    >>> getPackageName('alicevision-3.0')
+        'alicevision'
+    """
+    if package.isidentifier():  # Unversioned request: no delimiter can be found in an identifier
+        return package
+    return splitRezPackage(package)[0]
+
+
+@functools.lru_cache(maxsize=None)
+def getResolvedVersions(rezResolve):
+    """ Get the {name: version} of the packages resolved in a REZ_RESOLVE value
+    Implicit packages are ignored. The returned dict is cached and must not be modified.
+    >>> getResolvedVersions('~platform-linux meshroom-2023.1.0 alicevision-3.2-beta')
+        {'meshroom': '2023.1.0', 'alicevision': '3.2-beta'}
+    """
+    resolvedVersions = {}
+    for r in rezResolve.split():
+        if r.startswith('~'):  # remove implicit packages
+            continue
+        name, sep, version = r.partition('-')
+        if sep:
+            resolvedVersions[name] = version
+    return resolvedVersions
+
+
+@functools.lru_cache(maxsize=None)
+def getRequestPackages(rezUsedRequest, rezResolve):
+    """ Get the requested packages pinned to their resolved version
+    Weak (~) and conflict (!) requests are ignored.
+    >>> getRequestPackages('meshroom alicevision>=3', 'meshroom-2023.1.0 alicevision-3.2')
+        ('meshroom==2023.1.0', 'alicevision==3.2')
+    """
+    resolvedVersions = getResolvedVersions(rezResolve)
+    # Single pass, dict keys remove duplicates and keep the request order
+    packageNames = dict.fromkeys(getPackageName(p) for p in rezUsedRequest.split() if not p.startswith(('~', '!')))
+    # Use "==" to make sure the job uses the exact same version as the environment
+    # where meshroom is launched
+    return tuple([f"{p}=={resolvedVersions[p]}" for p in packageNames])